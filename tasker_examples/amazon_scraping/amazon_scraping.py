@@ -1,8 +1,12 @@
 import argparse
 import asyncio
+import contextlib
 import os
+import sys
+import tempfile
 import traceback
 from datetime import datetime
+from pathlib import Path
 
 from oagi import AsyncScreenshotMaker
 from oagi.agent.observer import AsyncAgentObserver
@@ -10,25 +14,52 @@ from oagi.agent.tasker import TaskerAgent
 from oagi.handler import AsyncPyautoguiActionHandler
 
 
-async def main():
-    parser = argparse.ArgumentParser(description='Crawl Amazon for product data')
-    parser.add_argument('--product_name', type=str, default='purse', help='Product name to search for')
-    parser.add_argument('--exp_name', type=str, default='amazon_crawl', help='Experiment name')
-    parser.add_argument('--save_dir', type=str, default='results/', help='Directory to save results')
-    parser.add_argument('--model_name', type=str, default='lux-actor-1', help='Model name')
-    parser.add_argument('--max_steps', type=int, default=24, help='Max steps per todo')
-    parser.add_argument('--temperature', type=float, default=0.0, help='Temperature')
-
-    args = parser.parse_args()
-
-    save_dir = os.path.join(args.save_dir, args.exp_name)
-    os.makedirs(save_dir, exist_ok=True)
-
-    instruction = f"Find the information about the top-selling {args.product_name} on Amazon"
-    todos = [
-        f"Open a new tab, go to www.amazon.com, and search for {args.product_name} in the search bar",
-        f"Click on 'Sort by' in the top right of the page and select 'Best Sellers'",
-    ]
+STATUS_ICONS = {
+    "completed": "✅",
+    "pending": "⏳",
+    "in_progress": "🔄",
+    "skipped": "⏭️",
+}
+
+INSTRUCTION_TEMPLATE = "Find the information about the top-selling {product_name} on Amazon"
+TODO_TEMPLATES = (
+    "Open a new tab, go to www.amazon.com, and search for {product_name} in the search bar",
+    "Click on 'Sort by' in the top right of the page and select 'Best Sellers'",
+)
+# With --reuse_browser, Amazon is already open in a warm browser window.
+REUSED_BROWSER_TODO_TEMPLATES = (
+    "In the open browser window, go to www.amazon.com, and search for {product_name} in the search bar",
+) + TODO_TEMPLATES[1:]
+
+
+@contextlib.asynccontextmanager
+async def persistent_browser(profile_dir: str):
+    """Keep one visible Chromium window open for every product in the batch.
+
+    The profile directory persists across invocations, so cookies and the HTTP
+    cache stay warm and only the first run pays the cold-start cost.
+    """
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as playwright:
+        context = await playwright.chromium.launch_persistent_context(user_data_dir=profile_dir, headless=False)
+        page = context.pages[0] if context.pages else await context.new_page()
+        await page.goto("https://www.amazon.com")
+        try:
+            yield page
+        finally:
+            await context.close()
+
+
+async def run_one(product_name: str, args: argparse.Namespace) -> bool:
+    """Run the scraping task for one product and return whether it succeeded."""
+    save_dir = Path(args.save_dir, args.exp_name)
+    save_dir.mkdir(parents=True, exist_ok=True)
+
+    fields = {"product_name": product_name}
+    instruction = INSTRUCTION_TEMPLATE.format_map(fields)
+    todo_templates = REUSED_BROWSER_TODO_TEMPLATES if args.reuse_browser else TODO_TEMPLATES
+    todos = [template.format_map(fields) for template in todo_templates]
 
     observer = AsyncAgentObserver()
     image_provider = AsyncScreenshotMaker()
@@ -67,12 +98,7 @@ async def main():
 
         print("\nTodo Status:")
         for i, todo in enumerate(memory.todos):
-            status_icon = {
-                "completed": "✅",
-                "pending": "⏳",
-                "in_progress": "🔄",
-                "skipped": "⏭️",
-            }.get(todo.status.value, "❓")
+            status_icon = STATUS_ICONS.get(todo.status.value, "❓")
             print(f"  {status_icon} [{i + 1}] {todo.description} - {todo.status.value}")
 
         status_summary = memory.get_todo_status_summary()
@@ -83,13 +109,97 @@ async def main():
         print(f"  Skipped: {status_summary.get('skipped', 0)}")
 
     except Exception as e:
+        success = False
         print(f"\n❌ Error during execution: {e}")
         traceback.print_exc()
 
-    output_file = os.path.join(save_dir, f"{args.product_name}_execution_history.html")
+    output_file = str(save_dir / f"{product_name}_execution_history.html")
     observer.export("html", output_file)
     print(f"\n📄 Execution history exported to: {output_file}")
+    return success
+
+
+async def run_on_display(product_name: str, args: argparse.Namespace, displays: asyncio.Queue):
+    # PyAutoGUI drives whichever screen $DISPLAY points at when it is imported,
+    # so each concurrent run gets its own process bound to a free display.
+    display = await displays.get()
+    try:
+        print(f"Running '{product_name}' on display {display}")
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, os.path.abspath(__file__),
+            '--product_name', product_name,
+            '--exp_name', args.exp_name,
+            '--save_dir', args.save_dir,
+            '--model_name', args.model_name,
+            '--max_steps', str(args.max_steps),
+            '--temperature', str(args.temperature),
+            *(['--reuse_browser', '--browser_profile_dir', f"{args.browser_profile_dir}{display}"]
+              if args.reuse_browser else []),
+            env={**os.environ, "DISPLAY": display},
+        )
+        returncode = await process.wait()
+        if returncode != 0:
+            print(f"❌ '{product_name}' failed on display {display} with exit status {returncode}")
+        return returncode
+    finally:
+        displays.put_nowait(display)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description='Crawl Amazon for product data')
+    parser.add_argument('--product_name', type=str, default='purse', help='Product name to search for')
+    parser.add_argument('--product_names', type=str, default=None,
+                        help='Comma-separated product names to search for in one batch')
+    parser.add_argument('--displays', type=str, default=None,
+                        help='Comma-separated X displays (e.g. ":1,:2") to run batch products on in parallel')
+    parser.add_argument('--reuse_browser', action='store_true',
+                        help='Launch one persistent browser window and reuse it for every product')
+    parser.add_argument('--browser_profile_dir', type=str,
+                        default=os.path.join(tempfile.gettempdir(), 'oagi-profile'),
+                        help='Browser profile directory used with --reuse_browser')
+    parser.add_argument('--exp_name', type=str, default='amazon_crawl', help='Experiment name')
+    parser.add_argument('--save_dir', type=str, default='results/', help='Directory to save results')
+    parser.add_argument('--model_name', type=str, default='lux-actor-1', help='Model name')
+    parser.add_argument('--max_steps', type=int, default=24, help='Max steps per todo')
+    parser.add_argument('--temperature', type=float, default=0.0, help='Temperature')
+
+    args = parser.parse_args()
+
+    if args.product_names:
+        product_names = [name.strip() for name in args.product_names.split(',') if name.strip()]
+    else:
+        product_names = [args.product_name]
+
+    display_names = [display.strip() for display in (args.displays or '').split(',') if display.strip()]
+
+    if display_names:
+        displays = asyncio.Queue()
+        for display in display_names:
+            displays.put_nowait(display)
+        returncodes = await asyncio.gather(*(run_on_display(name, args, displays) for name in product_names))
+        failed = [name for name, returncode in zip(product_names, returncodes) if returncode != 0]
+    else:
+        # All runs share one screen, so they have to take turns.
+        failed = []
+        async with contextlib.AsyncExitStack() as stack:
+            if args.reuse_browser:
+                await stack.enter_async_context(persistent_browser(args.browser_profile_dir))
+            for name in product_names:
+                if not await run_one(name, args):
+                    failed.append(name)
+
+    if failed:
+        print(f"\n❌ {len(failed)} of {len(product_names)} products failed: {', '.join(failed)}")
+        return 1
+    return 0
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    # uvloop has much lower per-callback overhead than the default event loop;
+    # it is optional and unavailable on Windows.
+    try:
+        import uvloop
+    except ImportError:
+        sys.exit(asyncio.run(main()))
+    else:
+        sys.exit(uvloop.run(main()))
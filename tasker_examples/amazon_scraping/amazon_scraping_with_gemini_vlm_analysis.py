@@ -1,37 +1,46 @@
 import os
-import json
+import sys
 import argparse
-import base64
 import asyncio
 import traceback
 from datetime import datetime
+from pathlib import Path
 
+import orjson
+import pybase64
 from oagi import AsyncScreenshotMaker
 from oagi.agent.observer import AsyncAgentObserver
 from oagi.agent.tasker import TaskerAgent
 from oagi.handler import AsyncPyautoguiActionHandler
 
 # Our custom VLM
-from model_engine import ModelEngine, ModelInfo
+from model_engine import ModelEngine
 
+# Shared helpers live in tasker_examples/, one level up from this script.
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tasker_utils import encode_screenshot, export_html_streaming, load_model_info
 
-def analyze_screenshot(screenshot_path: str, question: str, vlm: ModelEngine):
-    """Encode a screenshot and ask the model to answer `question` about it."""
-    if not os.path.exists(screenshot_path):
-        raise FileNotFoundError(f"Screenshot not found: {screenshot_path}")
+STATUS_ICONS = {
+    "completed": "✅",
+    "pending": "⏳",
+    "in_progress": "🔄",
+    "skipped": "⏭️",
+}
 
-    with open(screenshot_path, "rb") as f:
-        b64_image = base64.b64encode(f.read()).decode("ascii")
+INSTRUCTION_TEMPLATE = "Find the information about the top-selling {product_name} on Amazon"
+TODO_TEMPLATES = (
+    "Open a new tab, go to www.amazon.com, and search for {product_name} in the search bar",
+    "Click on 'Sort by' in the top right of the page and select 'Best Sellers'",
+)
 
-    lower_path = screenshot_path.lower()
-    if lower_path.endswith((".jpg", ".jpeg")):
-        mime = "image/jpeg"
-    else:
-        mime = "image/png"
+
+def analyze_screenshot(image_data: bytes, question: str, vlm: ModelEngine):
+    """Ask the model to answer `question` about JPEG bytes from `encode_screenshot`."""
+    b64_image = pybase64.b64encode_as_string(image_data)
 
     user_messages = [
         {"type": "text", "content": question},
-        {"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64_image}"}},
+        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64_image}"}},
     ]
 
     # No special system prompt needed; keep it empty to let the model focus on the question.
@@ -47,25 +56,22 @@ async def main():
     parser.add_argument('--model_name', type=str, default='lux-actor-1', help='Model name')
     parser.add_argument('--max_steps', type=int, default=24, help='Max steps per todo')
     parser.add_argument('--temperature', type=float, default=0.0, help='Temperature')
+    parser.add_argument('--direct_io', action='store_true',
+                        help='Write the HTML report with O_DIRECT, bypassing the page cache (Linux)')
 
     args = parser.parse_args()
 
     # save directory
-    save_dir = os.path.join(args.save_dir, args.exp_name)
-    os.makedirs(save_dir, exist_ok=True)
+    save_dir = Path(args.save_dir, args.exp_name)
+    save_dir.mkdir(parents=True, exist_ok=True)
 
     # load VLM
-    with open(args.model_info_path, 'r', encoding='utf-8') as f:
-        model_info = json.load(f)
-    model_info = ModelInfo(**model_info)
-    vlm = ModelEngine(model_info)
+    vlm = ModelEngine(load_model_info(args.model_info_path))
 
     # Define the workflow
-    instruction = f"Find the information about the top-selling {args.product_name} on Amazon"
-    todos = [
-        f"Open a new tab, go to www.amazon.com, and search for {args.product_name} in the search bar",
-        f"Click on 'Sort by' in the top right of the page and select 'Best Sellers'",
-    ]
+    fields = {"product_name": args.product_name}
+    instruction = INSTRUCTION_TEMPLATE.format_map(fields)
+    todos = [template.format_map(fields) for template in TODO_TEMPLATES]
 
     # Initialize automation toolkit
     observer = AsyncAgentObserver()
@@ -108,12 +114,7 @@ async def main():
         # Print todo statuses
         print("\nTodo Status:")
         for i, todo in enumerate(memory.todos):
-            status_icon = {
-                "completed": "✅",
-                "pending": "⏳",
-                "in_progress": "🔄",
-                "skipped": "⏭️",
-            }.get(todo.status.value, "❓")
+            status_icon = STATUS_ICONS.get(todo.status.value, "❓")
             print(f"  {status_icon} [{i + 1}] {todo.description} - {todo.status.value}")
 
         # Print execution statistics
@@ -128,32 +129,45 @@ async def main():
         print(f"\n❌ Error during execution: {e}")
         traceback.print_exc()
 
+    # Export HTML execution history in the background; it is independent of
+    # the final VLM analysis, so the two overlap.
+    output_file = str(save_dir / f"{args.product_name}_execution_history.html")
+    export_task = asyncio.create_task(asyncio.to_thread(export_html_streaming, observer, output_file, args.direct_io))
+
     # Analyze the final screenshot with VLM
-    screenshot_path = os.path.join(save_dir, f"{args.product_name}_screenshot.png")
+    screenshot_path = str(save_dir / f"{args.product_name}_screenshot.jpg")
     last_screenshot = await image_provider()
-    last_screenshot.image.save(screenshot_path)
-    
-    result = analyze_screenshot(
-        screenshot_path,
+    # Encode once; the same bytes feed both the archival file and the VLM request.
+    image_data = await asyncio.to_thread(encode_screenshot, last_screenshot.image)
+    write_task = asyncio.create_task(asyncio.to_thread(Path(screenshot_path).write_bytes, image_data))
+
+    result = await asyncio.to_thread(
+        analyze_screenshot,
+        image_data,
         "Describe the name, color, price, and discount of the items in the first row of the search results",
         vlm,
     )
     print(f"VLM result: {result}")
 
     # Save JSON results
-    result_path = os.path.join(save_dir, f"{args.product_name}_result.json")
-    with open(result_path, 'w', encoding='utf-8') as f:
-        json.dump({
-            "result": result,
-            "screenshot_path": screenshot_path,
-        }, f, ensure_ascii=False, indent=4)
+    result_path = str(save_dir / f"{args.product_name}_result.json")
+    result_json = orjson.dumps({
+        "result": result,
+        "screenshot_path": screenshot_path,
+    }, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    await asyncio.to_thread(Path(result_path).write_bytes, result_json)
     print(f"Results saved to {result_path}")
 
-    # Export HTML execution history
-    output_file = os.path.join(save_dir, f"{args.product_name}_execution_history.html")
-    observer.export("html", output_file)
+    await asyncio.gather(write_task, export_task)
     print(f"\n📄 Execution history exported to: {output_file}")
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
\ No newline at end of file
+    # uvloop has much lower per-callback overhead than the default event loop;
+    # it is optional and unavailable on Windows.
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file
@@ -1,17 +1,230 @@
 import streamlit as st
 import asyncio
+import hashlib
 import os
+import re
+import threading
+import time
 import traceback
+import weakref
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 from datetime import datetime
-from oagi import AsyncScreenshotMaker
-from oagi.agent.observer import AsyncAgentObserver
-from oagi.agent.tasker import TaskerAgent
-from oagi.handler import AsyncPyautoguiActionHandler
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from pathlib import Path
+
+# oagi (which pulls in pyautogui), httpx and tenacity are imported where they
+# are first used, so reruns that never start the agent don't pay for them.
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+STATUS_ICONS = {
+    "completed": "✅",
+    "pending": "⏳",
+    "in_progress": "🔄",
+    "skipped": "⏭️",
+}
+# Minimum seconds between redraws of the progress log while the agent runs.
+LOG_FLUSH_INTERVAL = 0.25
+# "Reuse identical runs" reuses results up to an hour old, keeping the 32 most
+# recently used.
+RESULT_TTL = 3600
+RESULT_CACHE_SIZE = 32
+
+DEFAULT_TODOS = (
+    "Open a new tab, go to www.amazon.com, and search for {product_name} in the search bar",
+    "Click on 'Sort by' in the top right of the page and select 'Best Sellers'",
+)
+DEFAULT_TODOS_TEXT = "\n".join(DEFAULT_TODOS)
+# Line breaks in pasted todos, including Windows CRLF and runs of blank lines.
+NEWLINE_RE = re.compile(r"[\r\n]+")
 
 # Set page configuration
 st.set_page_config(page_title="Amazon Scraping Tasker", page_icon="🛒", layout="wide")
 
+@dataclass(frozen=True, slots=True)
+class Config:
+    api_key: str
+    base_url: str
+
+@st.cache_resource(show_spinner=False)
+def get_config():
+    """Read the API settings from secrets/environment once per process."""
+    return Config(
+        api_key=st.secrets.get("OAGI_API_KEY") or os.getenv("OAGI_API_KEY", ""),
+        base_url=os.getenv("OAGI_BASE_URL", "https://api.agiopen.org"),
+    )
+
+class ProgressObserver:
+    """Forward agent events to an observer and report progress to the UI."""
+
+    def __init__(self, observer, on_progress):
+        self.observer = observer
+        self.on_progress = on_progress
+
+    async def on_event(self, event):
+        await self.observer.on_event(event)
+        if event.type == "split":
+            self.on_progress(event.label)
+        elif event.type == "step":
+            self.on_progress(f"Step {event.step_num}: {event.step.reason}")
+
+def is_server_error(exc):
+    """Whether `exc` is a 5xx response from the OAGI API, which is worth retrying."""
+    from oagi import APIError
+
+    return isinstance(exc, APIError) and (exc.status_code or 0) >= 500
+
+class SessionRunner:
+    """Own a session's event loop runner and close it when the session ends.
+
+    Streamlit has no session-end callback, but the session state is dropped
+    with the session, so the runner is closed when this holder is collected.
+    """
+
+    def __init__(self):
+        self.runner = asyncio.Runner(loop_factory=uvloop.new_event_loop if uvloop else None)
+        weakref.finalize(self, self.runner.close)
+
+def get_runner():
+    """Return this session's event loop runner, creating it on first use.
+
+    Reusing one loop per session avoids rebuilding the loop and its default
+    executor on every click.
+    """
+    if "session_runner" not in st.session_state:
+        st.session_state.session_runner = SessionRunner()
+    return st.session_state.session_runner.runner
+
+@st.cache_resource(show_spinner=False)
+def get_image_provider():
+    from oagi import AsyncScreenshotMaker
+
+    return AsyncScreenshotMaker()
+
+@st.cache_resource(show_spinner=False)
+def get_action_handler():
+    from oagi.handler import AsyncPyautoguiActionHandler
+
+    return AsyncPyautoguiActionHandler()
+
+def get_planner(api_key, base_url):
+    """Return a planner whose API client stays connected between runs.
+
+    The client is bound to the event loop it was created on, so the planner is
+    kept per session next to the session's runner instead of in
+    st.cache_resource, and replaced when the API settings change.
+    """
+    from oagi.agent.tasker import Planner
+
+    if st.session_state.get("planner_key") != (api_key, base_url):
+        st.session_state.planner = Planner(api_key=api_key, base_url=base_url)
+        st.session_state.planner_key = (api_key, base_url)
+    return st.session_state.planner
+
+@st.cache_resource(show_spinner=False)
+def api_key_hash(api_key):
+    """Short digest of the API key, used in cache keys instead of the key itself."""
+    return hashlib.blake2b(api_key.encode(), digest_size=8).hexdigest()
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def parse_todos(raw):
+    """Split the todos text area into non-empty, stripped lines."""
+    return [todo.strip() for todo in NEWLINE_RE.split(raw) if todo.strip()]
+
+async def execute_task(api_key, model_name, max_steps, temperature, instruction, todos, output_file, on_progress):
+    """Run the agent, export its history, and return (success, memory, history HTML bytes, finish time)."""
+    import httpx
+    from oagi import NetworkError
+    from oagi.agent.observer import AsyncAgentObserver
+    from oagi.agent.tasker import TaskerAgent
+    from tenacity import (
+        retry,
+        retry_if_exception,
+        retry_if_exception_type,
+        stop_after_attempt,
+        wait_exponential,
+        wait_random,
+    )
+
+    # Initialize components
+    observer = AsyncAgentObserver()
+    image_provider = get_image_provider()
+    action_handler = get_action_handler()
+    base_url = get_config().base_url
+
+    tasker = TaskerAgent(
+        api_key=api_key,
+        base_url=base_url,
+        model=model_name,
+        max_steps=max_steps,
+        temperature=temperature,
+        planner=get_planner(api_key, base_url),
+        step_observer=ProgressObserver(observer, on_progress),
+    )
+
+    tasker.set_task(task=instruction, todos=todos)
+
+    # Define retry strategy
+    # Only transient failures are retried; auth errors and bugs fail fast.
+    @retry(
+        stop=stop_after_attempt(3),
+        # Short first backoff, plus jitter so concurrent sessions don't retry in lockstep.
+        wait=wait_exponential(multiplier=0.5, min=1, max=8) + wait_random(0, 1),
+        retry=(
+            retry_if_exception_type((NetworkError, httpx.TransportError, asyncio.TimeoutError))
+            | retry_if_exception(is_server_error)
+        ),
+        reraise=True
+    )
+    async def execute_with_retry():
+        return await tasker.execute(
+            instruction="",
+            action_handler=action_handler,
+            image_provider=image_provider,
+        )
+
+    success = await execute_with_retry()
+
+    # Rendering the report is synchronous; keep it off the event loop.
+    await asyncio.to_thread(observer.export, "html", output_file)
+    history_bytes = await asyncio.to_thread(Path(output_file).read_bytes)
+    return success, tasker.get_memory(), history_bytes, time.time()
+
+@st.cache_resource(show_spinner=False)
+def get_result_cache():
+    """Results of recent runs, shared by all sessions and keyed on the run's inputs.
+
+    Kept in an LRU dict rather than st.cache_data, so a cache miss runs the
+    agent with live progress updates instead of having them recorded and
+    replayed.
+    """
+    return OrderedDict(), threading.Lock()
+
+def lookup_result(key):
+    """Return the result of an identical run from the last RESULT_TTL seconds, or None."""
+    results, lock = get_result_cache()
+    with lock:
+        result = results.get(key)
+        if result is None:
+            return None
+        # The run's finish time is the last element of the result.
+        if time.time() - result[-1] > RESULT_TTL:
+            del results[key]
+            return None
+        results.move_to_end(key)
+        return result
+
+def store_result(key, result):
+    results, lock = get_result_cache()
+    with lock:
+        results[key] = result
+        results.move_to_end(key)
+        while len(results) > RESULT_CACHE_SIZE:
+            results.popitem(last=False)
+
 def main():
     st.title("🛒 Amazon Scraping Tasker")
 
@@ -20,10 +233,7 @@ def main():
         st.header("Configuration")
         
         # API Key handling
-        if "OAGI_API_KEY" in st.secrets:
-            api_key = st.secrets["OAGI_API_KEY"]
-        else:
-            api_key = os.getenv("OAGI_API_KEY", "")
+        api_key = get_config().api_key
             
         if not api_key:
             st.error("Missing OAGI_API_KEY. Please set it in .streamlit/secrets.toml or environment variables.")
@@ -31,6 +241,7 @@ def main():
         model_name = st.text_input("Model Name", value="lux-actor-1")
         max_steps = st.number_input("Max Steps", min_value=1, value=24)
         temperature = st.slider("Temperature", min_value=0.0, max_value=1.0, value=0.0, step=0.1)
+        reuse_results = st.checkbox("Reuse identical runs from the last hour", value=False)
         
         st.subheader("Output Settings")
         save_dir = st.text_input("Save Directory", value="results/")
@@ -44,38 +255,73 @@ def main():
     with col1:
         product_name = st.text_input("Product Name", value="purse")
     
-    default_instruction = "Find the information about the top-selling {product_name} on Amazon"
-    instruction_template = st.text_area("Instruction Template", value=default_instruction, height=100)
-    
-    default_todos = [
-        "Open a new tab, go to www.amazon.com, and search for {product_name} in the search bar",
-        "Click on 'Sort by' in the top right of the page and select 'Best Sellers'",
-    ]
-    todos_input = st.text_area("Todos (one per line)", value="\n".join(default_todos), height=150)
+    # Seed the text areas once per session; afterwards Streamlit keeps their
+    # values in session state under their keys.
+    if "instruction_template" not in st.session_state:
+        st.session_state.instruction_template = "Find the information about the top-selling {product_name} on Amazon"
+    if "todos_raw" not in st.session_state:
+        st.session_state.todos_raw = DEFAULT_TODOS_TEXT
+
+    instruction_template = st.text_area("Instruction Template", key="instruction_template", height=100)
+    todos_input = st.text_area("Todos (one per line)", key="todos_raw", height=150)
 
     # Construct the final instruction and todos based on inputs
     final_instruction = instruction_template.format(product_name=product_name)
-    final_todos = [todo.format(product_name=product_name) for todo in todos_input.split('\n') if todo.strip()]
+    final_todos = [todo.format(product_name=product_name) for todo in parse_todos(todos_input)]
 
     st.info(f"**Final Instruction:** {final_instruction}")
     
-    if st.button("Run Agent", type="primary", disabled=not api_key):
-        run_agent(
-            api_key=api_key,
-            model_name=model_name,
-            max_steps=max_steps,
-            temperature=temperature,
-            save_dir=save_dir,
-            exp_name=exp_name,
-            product_name=product_name,
-            instruction=final_instruction,
-            todos=final_todos
+    # The on_click callback runs before the rerun, so the button is already
+    # disabled while this run executes and a double click can't start a second
+    # agent on the same screen. Streamlit drops clicks on widgets that are
+    # disabled when registered, so the run is started from the flag rather
+    # than from the button's return value, and the script reruns afterwards to
+    # draw the button enabled again.
+    running = st.session_state.get("running", False)
+    st.button("Run Agent", type="primary", disabled=running or not api_key,
+              on_click=st.session_state.update, kwargs={"running": True})
+    if running:
+        try:
+            run_agent(
+                api_key=api_key,
+                model_name=model_name,
+                max_steps=max_steps,
+                temperature=temperature,
+                save_dir=save_dir,
+                exp_name=exp_name,
+                reuse_results=reuse_results,
+                product_name=product_name,
+                instruction=final_instruction,
+                todos=final_todos
+            )
+        finally:
+            st.session_state.running = False
+        st.rerun()
+
+    if "last_run" in st.session_state:
+        show_last_run(st.session_state.last_run)
+
+    if "history_bytes" in st.session_state:
+        st.download_button(
+            label="Download Execution History (HTML)",
+            data=st.session_state.history_bytes,
+            file_name=st.session_state.history_file_name,
+            mime="text/html"
         )
 
-def run_agent(api_key, model_name, max_steps, temperature, save_dir, exp_name, product_name, instruction, todos):
+def run_agent(api_key, model_name, max_steps, temperature, save_dir, exp_name, reuse_results, product_name, instruction, todos):
+    # Drop the previous run's results so a failed run doesn't offer its report
+    st.session_state.pop("last_run", None)
+    st.session_state.pop("history_bytes", None)
+
     # Setup directories
     full_save_dir = os.path.join(save_dir, exp_name)
-    os.makedirs(full_save_dir, exist_ok=True)
+    created_dirs = st.session_state.setdefault("_mkdir_cache", set())
+    if full_save_dir not in created_dirs:
+        os.makedirs(full_save_dir, exist_ok=True)
+        created_dirs.add(full_save_dir)
+    file_name = f"{product_name}_execution_history.html"
+    output_file = os.path.join(full_save_dir, file_name)
     
     # Status container
     status_container = st.container()
@@ -84,87 +330,100 @@ def run_agent(api_key, model_name, max_steps, temperature, save_dir, exp_name, p
         st.write("---")
         st.subheader("Execution Status")
         progress_log = st.empty()
-        
-        async def execute_task():
-            # Initialize components
-            observer = AsyncAgentObserver()
-            image_provider = AsyncScreenshotMaker()
-            action_handler = AsyncPyautoguiActionHandler()
-            
-            tasker = TaskerAgent(
-                api_key=api_key,
-                base_url=os.getenv("OAGI_BASE_URL", "https://api.agiopen.org"),
-                model=model_name,
-                max_steps=max_steps,
-                temperature=temperature,
-                step_observer=observer,
-            )
-            
-            tasker.set_task(task=instruction, todos=todos)
-            
-            progress_log.text(f"Starting task execution at {datetime.now()}...\nTask: {instruction}\nNumber of todos: {len(todos)}")
-            
-            # Define retry strategy
-            @retry(
-                stop=stop_after_attempt(3),
-                wait=wait_exponential(multiplier=1, min=4, max=10),
-                retry=retry_if_exception_type(Exception),
-                reraise=True
-            )
-            async def execute_with_retry():
-                return await tasker.execute(
-                    instruction="",
-                    action_handler=action_handler,
-                    image_provider=image_provider,
+        # Progress lines collect in a bounded buffer that is redrawn at most
+        # every LOG_FLUSH_INTERVAL, not once per agent event.
+        log_buf = st.session_state.setdefault("log_buf", deque(maxlen=200))
+        log_buf.clear()
+        # Wall-clock time is formatted once; progress lines carry the elapsed
+        # monotonic time since the start instead.
+        start_ts = datetime.now().isoformat(timespec="seconds")
+        start = last_flush = time.monotonic()
+        log_buf.append(f"Starting task execution at {start_ts}...\nTask: {instruction}\nNumber of todos: {len(todos)}")
+        progress_log.text("\n".join(log_buf))
+        status = st.status("Running agent...")
+
+        def on_progress(label):
+            nonlocal last_flush
+            status.update(label=label)
+            now = time.monotonic()
+            log_buf.append(f"[+{now - start:.1f}s] {label}")
+            if now - last_flush >= LOG_FLUSH_INTERVAL:
+                progress_log.text("\n".join(log_buf))
+                last_flush = now
+
+        # The API key only enters the cache key as a hash.
+        key = (api_key_hash(api_key), model_name, max_steps, temperature, instruction, tuple(todos), output_file)
+        result = lookup_result(key) if reuse_results else None
+        reused = result is not None
+        try:
+            if not reused:
+                # Run on the session's persistent event loop
+                result = get_runner().run(
+                    execute_task(api_key, model_name, max_steps, temperature, instruction, todos, output_file, on_progress)
                 )
+                store_result(key, result)
+            success, memory, history_bytes, finished_at = result
+        except Exception as e:
+            # Results are kept in session state and drawn by show_last_run once
+            # the script reruns after the run.
+            st.session_state.last_run = {
+                "log": "\n".join(log_buf),
+                "error": str(e),
+                "traceback": traceback.format_exc(),
+            }
+            return
 
-            try:
-                success = await execute_with_retry()
-                
-                memory = tasker.get_memory()
-                
-                st.success(f"Execution Completed! Overall success: {success}")
-                
-                # Display Summary
-                st.subheader("Execution Summary")
-                st.text(memory.task_execution_summary)
-                
-                # Display Todo Status
-                st.subheader("Todo Status")
-                for i, todo in enumerate(memory.todos):
-                    status_icon = {
-                        "completed": "✅",
-                        "pending": "⏳",
-                        "in_progress": "🔄",
-                        "skipped": "⏭️",
-                    }.get(todo.status.value, "❓")
-                    st.write(f"{status_icon} **[{i + 1}]** {todo.description} - `{todo.status.value}`")
-                
-                # Export History
-                output_file = os.path.join(full_save_dir, f"{product_name}_execution_history.html")
-                observer.export("html", output_file)
-                st.success(f"Execution history exported to: `{output_file}`")
-                
-                # Provide download link (reading the file we just wrote)
-                try:
-                    with open(output_file, "rb") as f:
-                        st.download_button(
-                            label="Download Execution History (HTML)",
-                            data=f,
-                            file_name=f"{product_name}_execution_history.html",
-                            mime="text/html"
-                        )
-                except Exception as e:
-                    st.error(f"Could not prepare download: {e}")
-
-            except Exception as e:
-                st.error(f"Error during execution: {e}")
-                if "502" in str(e):
-                    st.warning("A 502 Bad Gateway error occurred. This indicates a temporary issue with the API server. The agent attempted to retry but failed. Please try again later.")
-                st.code(traceback.format_exc())
-
-        # Run the async function
-        asyncio.run(execute_task())
+        lines = []
+        for i, todo in enumerate(memory.todos):
+            todo_status = todo.status.value
+            status_icon = STATUS_ICONS.get(todo_status, "❓")
+            lines.append(f"{status_icon} **[{i + 1}]** {todo.description} - `{todo_status}`")
+        st.session_state.last_run = {
+            "log": "\n".join(log_buf),
+            "success": success,
+            "reused": reused,
+            "finished_at": finished_at,
+            "summary": memory.task_execution_summary,
+            "todo_status": "\n\n".join(lines),
+            "output_file": output_file,
+        }
+
+        # Keep the bytes in session state so the download button survives
+        # reruns (including the one triggered by clicking it).
+        st.session_state.history_bytes = history_bytes
+        st.session_state.history_file_name = file_name
+
+def show_last_run(last_run):
+    """Draw the results of the session's last run from session state."""
+    st.write("---")
+    st.subheader("Execution Status")
+    st.text(last_run["log"])
+
+    if "error" in last_run:
+        st.error(f"Error during execution: {last_run['error']}")
+        if "502" in last_run["error"]:
+            st.warning("A 502 Bad Gateway error occurred. This indicates a temporary issue with the API server. The agent attempted to retry but failed. Please try again later.")
+        st.code(last_run["traceback"])
+        return
+
+    if last_run["reused"]:
+        st.info(
+            f"Reused the result of an identical run from {datetime.fromtimestamp(last_run['finished_at']):%H:%M:%S}; "
+            f"the agent was not run again. Overall success: {last_run['success']}"
+        )
+    else:
+        st.success(f"Execution Completed! Overall success: {last_run['success']}")
+    
+    # Display Summary
+    st.subheader("Execution Summary")
+    st.text(last_run["summary"])
+    
+    # Display Todo Status as one element rather than one per todo
+    st.subheader("Todo Status")
+    st.markdown(last_run["todo_status"])
+    
+    if not last_run["reused"]:
+        st.success(f"Execution history exported to: `{last_run['output_file']}`")
 
 if __name__ == "__main__":
     main()
@@ -4,6 +4,7 @@ import os
 import sys
 import traceback
 from datetime import datetime
+from pathlib import Path
 
 from oagi import AsyncScreenshotMaker
 from oagi.agent.observer import AsyncAgentObserver
@@ -35,8 +36,8 @@ async def main():
 
     args = parser.parse_args()
 
-    save_dir = os.path.join(args.save_dir, args.exp_name)
-    os.makedirs(save_dir, exist_ok=True)
+    save_dir = Path(args.save_dir, args.exp_name)
+    save_dir.mkdir(parents=True, exist_ok=True)
 
     observer = AsyncAgentObserver()
     image_provider = AsyncScreenshotMaker()
@@ -90,10 +91,17 @@ async def main():
         print(f"Error during execution: {exc}")
         traceback.print_exc()
 
-    output_file = os.path.join(save_dir, "cvs_execution_history.html")
+    output_file = str(save_dir / "cvs_execution_history.html")
     observer.export("html", output_file)
     print(f"Exported execution history to {output_file}")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop has much lower per-callback overhead than the default event loop;
+    # it is optional and unavailable on Windows.
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
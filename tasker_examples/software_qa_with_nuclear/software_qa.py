@@ -3,6 +3,7 @@ import asyncio
 import os
 import traceback
 from datetime import datetime
+from pathlib import Path
 
 from oagi import AsyncScreenshotMaker
 from oagi.agent.observer import AsyncAgentObserver
@@ -10,6 +11,14 @@ from oagi.agent.tasker import TaskerAgent
 from oagi.handler import AsyncPyautoguiActionHandler
 
 
+STATUS_ICONS = {
+    "completed": "✅",
+    "pending": "⏳",
+    "in_progress": "🔄",
+    "skipped": "⏭️",
+}
+
+
 async def main():
     parser = argparse.ArgumentParser(description='Run QA Agent on Nuclear Player')
     parser.add_argument('--exp_name', type=str, default='nuclear_qa')
@@ -20,8 +29,8 @@ async def main():
 
     args = parser.parse_args()
 
-    save_dir = os.path.join(args.save_dir, args.exp_name)
-    os.makedirs(save_dir, exist_ok=True)
+    save_dir = Path(args.save_dir, args.exp_name)
+    save_dir.mkdir(parents=True, exist_ok=True)
 
     instruction = "QA: click through every sidebar button in the Nuclear Player UI"
     todos = [
@@ -78,12 +87,7 @@ async def main():
 
         print("\nTodo Status:")
         for i, todo in enumerate(memory.todos):
-            status_icon = {
-                "completed": "✅",
-                "pending": "⏳",
-                "in_progress": "🔄",
-                "skipped": "⏭️",
-            }.get(todo.status.value, "❓")
+            status_icon = STATUS_ICONS.get(todo.status.value, "❓")
             print(f"  {status_icon} [{i + 1}] {todo.description} - {todo.status.value}")
 
         status_summary = memory.get_todo_status_summary()
@@ -97,10 +101,17 @@ async def main():
         print(f"\n❌ Error during execution: {e}")
         traceback.print_exc()
 
-    output_file = os.path.join(save_dir, "nuclear_qa_execution_history.html")
+    output_file = str(save_dir / "nuclear_qa_execution_history.html")
     observer.export("html", output_file)
     print(f"\n📄 Execution history exported to: {output_file}")
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    # uvloop has much lower per-callback overhead than the default event loop;
+    # it is optional and unavailable on Windows.
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -1,53 +1,126 @@
 import os
 import json
+import sys
 import argparse
-import base64
 import asyncio
 import traceback
 from datetime import datetime
+from pathlib import Path
 import logging
 
+import pybase64
 from oagi import AsyncScreenshotMaker
 from oagi.types import SplitEvent
 from oagi.agent.observer import AsyncAgentObserver
 from oagi.agent.tasker import TaskerAgent
 from oagi.handler import AsyncPyautoguiActionHandler
 
-from model_engine import ModelEngine, ModelInfo
+from model_engine import ModelEngine
+
+# Shared helpers live in tasker_examples/, one level up from this script.
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tasker_utils import encode_screenshot, export_html_streaming, load_model_info
 
 logger = logging.getLogger(__name__)
 
+STATUS_ICONS = {
+    "completed": "✅",
+    "pending": "⏳",
+    "in_progress": "🔄",
+    "skipped": "⏭️",
+}
 
-def analyze_screenshot(screenshot_path: str, question: str, vlm: ModelEngine):
-    """Encode a screenshot and ask the model to answer `question` about it."""
-    if not os.path.exists(screenshot_path):
-        raise FileNotFoundError(f"Screenshot not found: {screenshot_path}")
 
-    with open(screenshot_path, "rb") as f:
-        b64_image = base64.b64encode(f.read()).decode("ascii")
+def analyze_screenshot(image_data: bytes, question: str, vlm: ModelEngine):
+    """Ask the model to answer `question` about JPEG bytes from `encode_screenshot`."""
+    b64_image = pybase64.b64encode_as_string(image_data)
+    return ask_about_image(f"data:image/jpeg;base64,{b64_image}", question, vlm)
 
-    lower_path = screenshot_path.lower()
-    if lower_path.endswith((".jpg", ".jpeg")):
-        mime = "image/jpeg"
-    else:
-        mime = "image/png"
 
+def ask_about_image(image_url: str, question: str, vlm: ModelEngine):
+    """Ask the model to answer `question` about an already encoded image URL."""
     user_messages = [
         {"type": "text", "content": question},
-        {"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64_image}"}},
+        {"type": "image_url", "image_url": {"url": image_url}},
     ]
 
     return vlm([], user_messages)
 
 
+def analyze_screenshots_batch(checks: list[tuple[str, str]], vlm: ModelEngine) -> dict[str, str] | None:
+    """Ask the model about several screenshots in a single multi-image request.
+
+    `checks` pairs each page name with the image URL of the screenshot that
+    should show it.
+    Returns a yes/no answer per page name, or None if the reply could not be
+    parsed (e.g. the model does not follow the requested format).
+    """
+    expected = "\n".join(f"Image {i + 1} should show the {name} page" for i, (name, _) in enumerate(checks))
+    question = (
+        f"You are given {len(checks)} screenshots of a software UI, in order.\n"
+        f"{expected}\n"
+        "For each image, check if the software is displaying the expected page. "
+        f"Reply with only a JSON array of {len(checks)} strings, each \"yes\" or \"no\", in image order."
+    )
+
+    user_messages = [{"type": "text", "content": question}]
+    for _, image_url in checks:
+        user_messages.append({"type": "image_url", "image_url": {"url": image_url}})
+
+    reply = str(vlm([], user_messages))
+    try:
+        answers = json.loads(reply[reply.index("["):reply.rindex("]") + 1])
+    except ValueError:
+        logger.warning(f"Could not parse batched VLM reply: {reply}")
+        return None
+    if not isinstance(answers, list) or len(answers) != len(checks):
+        logger.warning(f"Batched VLM reply has the wrong shape: {reply}")
+        return None
+
+    return {name: str(answer) for (name, _), answer in zip(checks, answers)}
+
+
 class QATaskerAgent(TaskerAgent):
-    def __init__(self, list_of_checkers: list[str], vlm: ModelEngine, save_dir: str, *args, **kwargs):
+    def __init__(
+        self,
+        list_of_checkers: list[str],
+        vlm: ModelEngine,
+        save_dir: str | Path,
+        *args,
+        max_concurrent_vlm_calls: int = 4,
+        batch_vlm_checks: bool = False,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.list_of_checkers = list_of_checkers
         self.vlm = vlm
-        self.save_dir = save_dir
+        self.save_dir = Path(save_dir)
         self.qa_result = {}
-    
+        self._pending_writes: list[asyncio.Task] = []
+        self._write_semaphore = asyncio.BoundedSemaphore(2)
+        # VLM checks run in the background while the next todo drives the UI;
+        # the semaphore keeps us within the VLM provider's rate limits.
+        self._vlm_tasks: dict[str, asyncio.Task] = {}
+        self._vlm_semaphore = asyncio.Semaphore(max_concurrent_vlm_calls)
+        # With batching, checkpoints are collected and sent in one multi-image
+        # request after the last todo, paying a single prefill instead of one per page.
+        self.batch_vlm_checks = batch_vlm_checks
+        self._batched_checks: list[tuple[str, str]] = []
+
+    async def _write_checkpoint(self, path: Path, image_data: bytes):
+        async with self._write_semaphore:
+            await asyncio.to_thread(path.write_bytes, image_data)
+
+    async def _analyze_async(self, checker: str, image_url: str, question: str):
+        async with self._vlm_semaphore:
+            result = await asyncio.to_thread(ask_about_image, image_url, question, self.vlm)
+        print(f"VLM result for {checker}: {result}")
+        return result
+
+    def _start_vlm_check(self, checker: str, image_url: str):
+        question = f"Check if software is displaying the page of {checker} with a simple yes or no answer"
+        self._vlm_tasks[checker] = asyncio.create_task(self._analyze_async(checker, image_url, question))
+
     async def execute(
         self,
         instruction: str,
@@ -85,20 +158,44 @@ class QATaskerAgent(TaskerAgent):
 
             self._update_task_summary()
 
-            screenshot_path = os.path.join(
-                self.save_dir, 
-                f"todo_{todo_index}_{self.list_of_checkers[todo_index]}_screenshot.png"
-            )
+            screenshot_path = self.save_dir / f"todo_{todo_index}_{self.list_of_checkers[todo_index]}_screenshot.jpg"
             last_screenshot = await image_provider()
-            last_screenshot.image.save(screenshot_path)
-            
-            result = analyze_screenshot(
-                screenshot_path, 
-                f"Check if software is displaying the page of {self.list_of_checkers[todo_index]} with a simple yes or no answer", 
-                self.vlm
+            # PIL releases the GIL while encoding, so keep it off the event loop.
+            image_data = await asyncio.to_thread(encode_screenshot, last_screenshot.image)
+            # Persist the checkpoint in the background; the VLM reads the bytes directly.
+            self._pending_writes.append(
+                asyncio.create_task(self._write_checkpoint(screenshot_path, image_data))
             )
-            print(f"VLM result for {self.list_of_checkers[todo_index]}: {result}")
-            self.qa_result[self.list_of_checkers[todo_index]] = result
+
+            checker = self.list_of_checkers[todo_index]
+            image_url = f"data:image/jpeg;base64,{pybase64.b64encode_as_string(image_data)}"
+            if self.batch_vlm_checks:
+                self._batched_checks.append((checker, image_url))
+            else:
+                self._start_vlm_check(checker, image_url)
+
+        await asyncio.gather(*self._pending_writes)
+        self._pending_writes.clear()
+
+        if self._batched_checks:
+            batch_result = await asyncio.to_thread(
+                analyze_screenshots_batch,
+                self._batched_checks,
+                self.vlm,
+            )
+            if batch_result is None:
+                logger.warning("Falling back to one VLM request per checkpoint")
+                for checker, image_url in self._batched_checks:
+                    self._start_vlm_check(checker, image_url)
+            else:
+                for checker, result in batch_result.items():
+                    print(f"VLM result for {checker}: {result}")
+                self.qa_result.update(batch_result)
+            self._batched_checks.clear()
+
+        results = await asyncio.gather(*self._vlm_tasks.values())
+        self.qa_result.update(zip(self._vlm_tasks.keys(), results))
+        self._vlm_tasks.clear()
 
         status_summary = self.memory.get_todo_status_summary()
         logger.info(f"Workflow complete. Status summary: {status_summary}")
@@ -115,16 +212,17 @@ async def main():
     parser.add_argument('--model_name', type=str, default='lux-actor-1')
     parser.add_argument('--max_steps', type=int, default=24)
     parser.add_argument('--temperature', type=float, default=0.0)
+    parser.add_argument('--direct_io', action='store_true',
+                        help='Write the HTML report with O_DIRECT, bypassing the page cache (Linux)')
+    parser.add_argument('--batch_vlm', action='store_true',
+                        help='Check all pages in one multi-image VLM request (model must support multiple images)')
 
     args = parser.parse_args()
 
-    save_dir = os.path.join(args.save_dir, args.exp_name)
-    os.makedirs(save_dir, exist_ok=True)
+    save_dir = Path(args.save_dir, args.exp_name)
+    save_dir.mkdir(parents=True, exist_ok=True)
 
-    with open(args.model_info_path, 'r', encoding='utf-8') as f:
-        model_info = json.load(f)
-    model_info = ModelInfo(**model_info)
-    vlm = ModelEngine(model_info)
+    vlm = ModelEngine(load_model_info(args.model_info_path))
 
     instruction = "QA: click through every sidebar button in the Nuclear Player UI"
     todos = [
@@ -165,6 +263,7 @@ async def main():
         list_of_checkers=list_of_checkers,
         vlm=vlm,
         save_dir=save_dir,
+        batch_vlm_checks=args.batch_vlm,
     )
 
     tasker.set_task(task=instruction, todos=todos)
@@ -191,12 +290,7 @@ async def main():
 
         print("\nTodo Status:")
         for i, todo in enumerate(memory.todos):
-            status_icon = {
-                "completed": "✅",
-                "pending": "⏳",
-                "in_progress": "🔄",
-                "skipped": "⏭️",
-            }.get(todo.status.value, "❓")
+            status_icon = STATUS_ICONS.get(todo.status.value, "❓")
             print(f"  {status_icon} [{i + 1}] {todo.description} - {todo.status.value}")
 
         status_summary = memory.get_todo_status_summary()
@@ -214,20 +308,33 @@ async def main():
         print(f"\n❌ Error during execution: {e}")
         traceback.print_exc()
 
-    screenshot_path = os.path.join(save_dir, f"{args.product_name}_screenshot.png")
+    # The report export and the final VLM analysis are independent; overlap them.
+    output_file = str(save_dir / "nuclear_qa_execution_history.html")
+    export_task = asyncio.create_task(asyncio.to_thread(export_html_streaming, observer, output_file, args.direct_io))
+
+    screenshot_path = str(save_dir / f"{args.product_name}_screenshot.jpg")
     last_screenshot = await image_provider()
-    last_screenshot.image.save(screenshot_path)
-    result = analyze_screenshot(
-        screenshot_path,
+    # Encode once; the same bytes feed both the archival file and the VLM request.
+    image_data = await asyncio.to_thread(encode_screenshot, last_screenshot.image)
+    write_task = asyncio.create_task(asyncio.to_thread(Path(screenshot_path).write_bytes, image_data))
+    result = await asyncio.to_thread(
+        analyze_screenshot,
+        image_data,
         "List the sidebar buttons visible in the Nuclear Player and describe any that look disabled.",
         vlm,
     )
     print(f"VLM result: {result}")
 
-    output_file = os.path.join(save_dir, "nuclear_qa_execution_history.html")
-    observer.export("html", output_file)
+    await asyncio.gather(write_task, export_task)
     print(f"\n📄 Execution history exported to: {output_file}")
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
\ No newline at end of file
+    # uvloop has much lower per-callback overhead than the default event loop;
+    # it is optional and unavailable on Windows.
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
\ No newline at end of file
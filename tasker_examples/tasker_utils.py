@@ -0,0 +1,167 @@
+"""Helpers shared by the VLM-analysis examples.
+
+The example scripts add this directory to `sys.path` and import from here.
+"""
+import functools
+import inspect
+import io
+import json
+import logging
+import mmap
+import os
+from collections.abc import Iterable
+from pathlib import Path
+
+import pybase64
+from PIL import Image
+
+from model_engine import ModelInfo
+
+logger = logging.getLogger(__name__)
+
+# JPEG encodes an order of magnitude faster than PNG and yields a much smaller
+# base64 payload, which matters since every screenshot is sent to the VLM.
+JPEG_QUALITY = 82
+
+# The VLM resizes images server-side anyway, so downscale to its working
+# resolution before encoding to save client CPU, bandwidth and image tokens.
+# Installing Pillow-SIMD in place of Pillow speeds up the resize further.
+VLM_MAX_EDGE = 1280
+
+# Reports are written in 1 MiB chunks, a whole number of pages for O_DIRECT.
+EXPORT_CHUNK_SIZE = 1 << 20
+
+
+@functools.lru_cache(maxsize=4)
+def load_model_info(path: str) -> ModelInfo:
+    """Load and validate a model info JSON file, once per path."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return ModelInfo(**json.load(f))
+
+
+def encode_screenshot(image: Image.Image) -> bytes:
+    """Downscale a PIL screenshot and encode it to JPEG bytes in memory."""
+    image = image.convert("RGB")
+    image.thumbnail((VLM_MAX_EDGE, VLM_MAX_EDGE), Image.Resampling.BILINEAR)
+    buf = io.BytesIO()
+    image.save(buf, format="JPEG", quality=JPEG_QUALITY, optimize=False)
+    return buf.getvalue()
+
+
+def _report_parts():
+    """Return the report template's head and tail and oagi's event converter.
+
+    Both are oagi internals, so they are looked up only when a report is
+    exported; `export_html_streaming` falls back to `observer.export` if they
+    have moved.
+    """
+    from oagi.agent.observer import AsyncAgentObserver
+    from oagi.agent.observer.exporters import _convert_events_for_html
+
+    template_path = Path(inspect.getfile(AsyncAgentObserver)).parent / "report_template.html"
+    head, tail = template_path.read_text(encoding="utf-8").split("{EVENTS_DATA}", 1)
+    return head, tail, _convert_events_for_html
+
+
+def iter_report_html(observer, head: str, tail: str, convert_events):
+    """Yield the observer's HTML report piece by piece, one event at a time.
+
+    Produces the same report as `observer.export("html", path)`. Screenshots
+    are embedded as-is with pybase64, under their real MIME type.
+    """
+    yield head
+    yield "["
+    separator = ""
+    for event in observer.events:
+        image = getattr(event, "image", None)
+        if isinstance(image, bytes):
+            # oagi already captures step screenshots as JPEG; the template
+            # assumes PNG unless it is given a data URL.
+            mime = "image/jpeg" if image.startswith(b"\xff\xd8") else "image/png"
+            image_url = f"data:{mime};base64,{pybase64.b64encode_as_string(image)}"
+            event = event.model_copy(update={"image": image_url})
+        for item in convert_events([event]):
+            yield separator + json.dumps(item)
+            separator = ","
+    yield "]"
+    yield tail
+
+
+def export_html_to_fd(fragments: Iterable[str], fd: int, direct_io: bool = False):
+    """Write HTML fragments to an open file descriptor in 1 MiB chunks.
+
+    Chunks are staged in a page-aligned buffer, as O_DIRECT requires. With
+    `direct_io` the last chunk is zero-padded to a whole page and the file is
+    truncated back to the report's real length afterwards.
+    """
+    buf = mmap.mmap(-1, EXPORT_CHUNK_SIZE)
+    view = memoryview(buf)
+    filled = 0
+    total = 0
+    try:
+        for fragment in fragments:
+            data = memoryview(fragment.encode("utf-8"))
+            while data:
+                n = min(len(data), EXPORT_CHUNK_SIZE - filled)
+                view[filled:filled + n] = data[:n]
+                filled += n
+                data = data[n:]
+                if filled == EXPORT_CHUNK_SIZE:
+                    _write_all(fd, view)
+                    total += filled
+                    filled = 0
+        if filled:
+            if direct_io:
+                padded = -(-filled // mmap.PAGESIZE) * mmap.PAGESIZE
+                view[filled:padded] = bytes(padded - filled)
+                _write_all(fd, view[:padded])
+            else:
+                _write_all(fd, view[:filled])
+            total += filled
+        if direct_io:
+            os.ftruncate(fd, total)
+    finally:
+        view.release()
+        buf.close()
+
+
+def _write_all(fd: int, data: memoryview):
+    while data:
+        data = data[os.write(fd, data):]
+
+
+def export_html_streaming(observer, path: str, direct_io: bool = False):
+    """Stream the HTML report to `path` without building it in memory.
+
+    With `direct_io`, the file is opened with O_DIRECT so the large write
+    bypasses the page cache; this falls back to buffered writes where the
+    platform or filesystem does not support it. If this oagi version no longer
+    has the internals the streaming export relies on, `observer.export` is
+    used instead.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        head, tail, convert_events = _report_parts()
+    except (ImportError, OSError, ValueError) as e:
+        logger.warning(f"Streaming report export is unavailable ({e}); using observer.export")
+        observer.export("html", path)
+        return
+    fragments = iter_report_html(observer, head, tail, convert_events)
+
+    if not direct_io:
+        with open(path, "w", encoding="utf-8", buffering=EXPORT_CHUNK_SIZE) as f:
+            f.writelines(fragments)
+        return
+
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    try:
+        fd = os.open(path, flags | os.O_DIRECT, 0o644)
+    except (AttributeError, OSError):
+        logger.warning(f"O_DIRECT is not supported for {path}; using buffered writes")
+        fd = os.open(path, flags, 0o644)
+        direct_io = False
+    try:
+        export_html_to_fd(fragments, fd, direct_io)
+    finally:
+        os.close(fd)